@@ -1,34 +1,69 @@
 import os
-import re
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
-# Regex para capturar nomes de exceções
-exception_pattern = re.compile(r"\b([\w\.]+Exception)\b")
+# RE2 (google-re2) é um motor DFA de tempo linear; usa o re padrão se não estiver instalado
+try:
+    import re2 as re_engine
+    # No RE2, \w e \b só reconhecem ASCII: classes Unicode explícitas mantêm
+    # nomes como 'MyÉException' inteiros, como no re padrão
+    EXCEPTION_REGEX = r"([\pL\pN_][\pL\pN_.]*Exception)(?:[^\pL\pN_]|$)"
+except ImportError:
+    import re as re_engine
+    EXCEPTION_REGEX = r"\b([\w\.]+Exception)\b"
 
-# Contador de exceções
-exception_counter = Counter()
+# Regex para capturar nomes de exceções (aplicada a blocos inteiros)
+exception_pattern = re_engine.compile(EXCEPTION_REGEX)
 
-# Caminho da pasta atual
-folder_path = os.getcwd()
+# Tamanho dos blocos lidos de cada arquivo (a memória fica limitada a isso)
+BLOCK_SIZE = 32 << 20
 
-print("🔍 Procurando exceções nos logs...\n")
 
-# Itera sobre os arquivos de log
-for filename in os.listdir(folder_path):
-    if filename.endswith(".log") or filename.endswith(".txt"):
-        file_path = os.path.join(folder_path, filename)
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as log_file:
-            for line in log_file:
-                matches = exception_pattern.findall(line)
-                for exc in matches:
-                    exception_counter[exc] += 1
+def scan_file(path):
+    """
+    Conta as exceções encontradas em um único arquivo de log.
+    O arquivo é lido em blocos cortados na última quebra de linha (o resto
+    segue para o bloco seguinte); cada bloco é decodificado e a regex
+    percorre o bloco inteiro, sem quebrar em linhas.
+    """
+    counter = Counter()
+    tail = b""
+    with open(path, 'rb') as log_file:
+        for block in iter(lambda: log_file.read(BLOCK_SIZE), b""):
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            tail = block[cut:]
+            counter.update(exception_pattern.findall(block[:cut].decode('utf-8', errors='ignore')))
+    counter.update(exception_pattern.findall(tail.decode('utf-8', errors='ignore')))
+    return counter
 
-# Exibe as exceções mais comuns
-print("📊 Exceções mais recorrentes:")
-if exception_counter:
-    for exc, count in exception_counter.most_common(20):
-        print(f"{count:3}x → {exc}")
-else:
-    print("⚠️ Nenhuma exceção encontrada.")
 
-print("\n✅ Análise concluída.")
+if __name__ == "__main__":
+    # Contador de exceções
+    exception_counter = Counter()
+
+    # Caminho da pasta atual
+    folder_path = os.getcwd()
+
+    print("🔍 Procurando exceções nos logs...\n")
+
+    # Lista os arquivos de log da pasta
+    paths = [
+        entry.path for entry in os.scandir(folder_path)
+        if entry.is_file() and entry.name.endswith((".log", ".txt"))
+    ]
+
+    # Processa os arquivos em paralelo (um processo por núcleo)
+    with ProcessPoolExecutor() as executor:
+        for partial in executor.map(scan_file, paths, chunksize=4):
+            exception_counter.update(partial)
+
+    # Exibe as exceções mais comuns
+    print("📊 Exceções mais recorrentes:")
+    if exception_counter:
+        for exc, count in exception_counter.most_common(20):
+            print(f"{count:3}x → {exc}")
+    else:
+        print("⚠️ Nenhuma exceção encontrada.")
+
+    print("\n✅ Análise concluída.")
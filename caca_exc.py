@@ -1,39 +1,83 @@
 import os
 import re
+import mmap
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# RE2 (google-re2) é um motor DFA de tempo linear; usa o re padrão se não estiver instalado
+try:
+    import re2 as re_engine
+    # No RE2, \s só reconhece ASCII: a classe explícita reproduz o \s do re padrão
+    ERROR_REGEX = r":[\s\x{0B}\x{1C}-\x{1F}\x{85}\p{Z}]+(.*)"
+except ImportError:
+    import re as re_engine
+    ERROR_REGEX = r":\s+(.*)"
 
 # Regex para capturar mensagens de erro após o separador " : "
-error_pattern = re.compile(r":\s+(.*)")
-
-# Contador de mensagens
-error_counter = Counter()
-
-# Caminho da pasta atual
-folder_path = os.getcwd()
-
-print("🔍 Analisando mensagens de erro nos logs...\n")
-
-# Itera sobre os arquivos de log
-for filename in os.listdir(folder_path):
-    if filename.endswith(".log") or filename.endswith(".txt"):
-        file_path = os.path.join(folder_path, filename)
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as log_file:
-            for line in log_file:
-                if "ERROR" in line:
-                    match = error_pattern.search(line)
-                    if match:
-                        message = match.group(1).strip()
-                        # Normaliza espaços e remove IDs ou números repetitivos
-                        message = re.sub(r"\s+", " ", message)
-                        message = re.sub(r"\d{4,}", "", message)
-                        error_counter[message] += 1
-
-# Exibe os erros mais comuns
-print("📊 Mensagens de erro mais recorrentes:")
-if error_counter:
-    for msg, count in error_counter.most_common(20):
-        print(f"{count:3}x → {msg}")
-else:
-    print("⚠️ Nenhuma mensagem de erro encontrada.")
-
-print("\n✅ Análise concluída.")
+error_pattern = re_engine.compile(ERROR_REGEX)
+
+# Regexes de normalização (compiladas uma única vez, fora do loop).
+# Ficam no re padrão: no RE2, \s e \d só reconhecem ASCII, e aqui elas só
+# rodam sobre a mensagem capturada, então o motor linear não faz diferença
+WS_RE = re.compile(r"\s+")
+DIGITS_RE = re.compile(r"\d{4,}")
+
+
+def scan_file(path):
+    """
+    Conta as mensagens de erro encontradas em um único arquivo de log.
+    As linhas são lidas em bytes direto do arquivo mapeado em memória;
+    só as que contêm "ERROR" são decodificadas antes da regex.
+    """
+    counter = Counter()
+    with open(path, 'rb') as log_file:
+        # mmap não aceita arquivos vazios
+        if os.fstat(log_file.fileno()).st_size == 0:
+            return counter
+        mm = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for line in iter(mm.readline, b""):
+                # Filtro literal barato antes de qualquer regex
+                if b"ERROR" not in line:
+                    continue
+                match = error_pattern.search(line.decode('utf-8', errors='ignore'))
+                if match:
+                    message = match.group(1).strip()
+                    # Normaliza espaços e remove IDs ou números repetitivos
+                    message = WS_RE.sub(" ", message)
+                    message = DIGITS_RE.sub("", message)
+                    counter[message] += 1
+        finally:
+            mm.close()
+    return counter
+
+
+if __name__ == "__main__":
+    # Contador de mensagens
+    error_counter = Counter()
+
+    # Caminho da pasta atual
+    folder_path = os.getcwd()
+
+    print("🔍 Analisando mensagens de erro nos logs...\n")
+
+    # Lista os arquivos de log da pasta
+    paths = [
+        entry.path for entry in os.scandir(folder_path)
+        if entry.is_file() and entry.name.endswith((".log", ".txt"))
+    ]
+
+    # Processa os arquivos em paralelo (um processo por núcleo)
+    with ProcessPoolExecutor() as executor:
+        for partial in executor.map(scan_file, paths, chunksize=4):
+            error_counter.update(partial)
+
+    # Exibe os erros mais comuns
+    print("📊 Mensagens de erro mais recorrentes:")
+    if error_counter:
+        for msg, count in error_counter.most_common(20):
+            print(f"{count:3}x → {msg}")
+    else:
+        print("⚠️ Nenhuma mensagem de erro encontrada.")
+
+    print("\n✅ Análise concluída.")
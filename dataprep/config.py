@@ -25,6 +25,8 @@ MAX_PEPTIDE_LENGTH = 30
 IEDB_QUERY_URL = "https://query-api.iedb.org/bcell_export"
 IEDB_EPITOPE_BASE_URL = "http://www.iedb.org/epitope/"
 IEDB_PAGINATION_LIMIT = 10000 
+IEDB_MAX_INFLIGHT_REQUESTS = 4   # Pages downloaded concurrently
+IEDB_SUBMIT_INTERVAL = 0.1       # Seconds between page requests (rate limiting)
 
 # IEDB API filtering parameters (as key-value tuples)
 IEDB_BASE_PARAMS_LIST = [
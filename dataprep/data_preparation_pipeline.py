@@ -2,14 +2,25 @@
 
 import os
 import re
-import io
+import csv
 import time
-import random
 import requests
+import numpy as np
 import pandas as pd
-from Bio import SeqIO
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from typing import Tuple, Optional, List, Dict
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the sampling kernel runs as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 # zipfile is no longer strictly needed for API logic but is kept for general robustness
 
 # Import configurations
@@ -18,6 +29,7 @@ from config import (
     TARGET_SAMPLE_SIZE, IEDB_EPITOPE_BASE_URL,
     UNIPROT_URL, UNIPROT_PARAMS, MIN_PEPTIDE_LENGTH, MAX_PEPTIDE_LENGTH,
     LOG_CONFIG, DEFAULT_REQUEST_HEADERS, IEDB_QUERY_URL, IEDB_PAGINATION_LIMIT,
+    IEDB_MAX_INFLIGHT_REQUESTS, IEDB_SUBMIT_INTERVAL,
     IEDB_BASE_PARAMS_LIST, IEDB_SEQUENCE_CANDIDATES, IEDB_ORGANISM_CANDIDATES,
     IEDB_PROTEIN_CANDIDATES
 )
@@ -28,6 +40,13 @@ from config import (
 logging.basicConfig(**LOG_CONFIG)
 logger = logging.getLogger(__name__)
 
+# Byte lookup table for the sampling kernel: 0 marks invalid amino acids (B, J, O, U, X, Z)
+VALID_AA_LUT = np.ones(256, dtype=np.uint8)
+VALID_AA_LUT[np.frombuffer(b'BJOUXZ', dtype=np.uint8)] = 0
+
+# Byte translation table that uppercases ASCII letters in raw FASTA sequences
+UPPERCASE_TABLE = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz', b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
 # ------------------------------------------------------------------------------
 # 2. HELPER FUNCTIONS (UTILITIES)
 # ------------------------------------------------------------------------------
@@ -49,16 +68,18 @@ def create_accession_id(df: pd.DataFrame) -> pd.DataFrame:
         found_id_col = next((col for col in id_candidates if col in df.columns), None)
 
         if found_id_col: 
-            # Use IEDB's own ID as base and clean up float/spaces
-            df['Epitope_ID'] = df[found_id_col].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-            # Filter out any non-numeric IDs that might remain if cleaning failed
-            df = df[df['Epitope_ID'].str.isnumeric()]
+            # Use IEDB's own ID as base: a single numeric cast handles float-read IDs (e.g. 34.0)
+            ids = pd.to_numeric(df[found_id_col], errors='coerce').astype('Float64')
+            # Filter out any non-integer or negative IDs
+            valid = ids.notna() & (ids % 1 == 0) & (ids >= 0)
+            df = df[valid].copy()
+            df['Epitope_ID'] = ids[valid].astype('int64').astype(str)
             df['Accession_ID'] = 'IEDB_EPI_' + df['Epitope_ID']
         else: 
             # Fallback to sequential ID
             df.reset_index(drop=True, inplace=True)
-            df['Accession_ID'] = df.index.map(lambda x: f"IEDB_EPI_{x + 1:06d}")
-            df['Epitope_ID'] = df['Accession_ID'].str.replace('IEDB_EPI_', '') # Use the number part for FASTA header
+            df['Epitope_ID'] = np.char.zfill(np.arange(1, len(df) + 1).astype(str), 6) # Use the number part for FASTA header
+            df['Accession_ID'] = 'IEDB_EPI_' + df['Epitope_ID']
 
     return df
 
@@ -75,26 +96,123 @@ def clean_iedb_sequence(df: pd.DataFrame) -> pd.DataFrame:
         The cleaned and filtered DataFrame.
     """
     if 'Sequence' in df.columns:
-        df["Sequence"] = df["Sequence"].astype(str).str.upper()
-        
-        # 1. Remove PTM notations (e.g., +CITR(R1))
-        df["Sequence"] = df["Sequence"].str.replace(r'\s*\+.*', '', regex=True)
-        # 2. Remove trailing spaces and extra text
-        df["Sequence"] = df["Sequence"].str.replace(r'\s+.*', '', regex=True)
-        
-        # 3. Apply standard quality filters
+        # Arrow-backed strings: the .str methods below run as pyarrow.compute kernels
+        df["Sequence"] = df["Sequence"].astype("string[pyarrow]").str.upper()
+
+        # 1. Remove PTM notations (e.g., +CITR(R1)) and trailing spaces/extra text in one pass
+        df["Sequence"] = df["Sequence"].str.replace(r'[\s+].*', '', regex=True)
+
+        # 2. Apply standard quality filters: length and invalid amino acids
+        #    (B, J, O, U, X, Z) / MPT characters combined into a single mask
         df = df.dropna(subset=["Sequence", "Organism"])
-        df = df[df["Sequence"].str.len().between(MIN_PEPTIDE_LENGTH, MAX_PEPTIDE_LENGTH)]
-        
-        # 4. Remove sequences with invalid amino acids (B, J, O, U, X, Z) and MPT characters
-        df = df[~df['Sequence'].str.contains(r'[BJOUXZ\+\(\)]', regex=True)]
-        
-        # 5. Keep only unique sequences
+        lengths = df["Sequence"].str.len()
+        invalid = df['Sequence'].str.contains(r'[BJOUXZ\+\(\)]', regex=True)
+        df = df[lengths.between(MIN_PEPTIDE_LENGTH, MAX_PEPTIDE_LENGTH) & ~invalid]
+
+        # 3. Keep only unique sequences
         df = df.drop_duplicates(subset=["Sequence"])
     
     return df
 
 
+def iter_fasta_records(chunks):
+    """
+    Streams FASTA records as raw bytes from an iterable of byte chunks, without 
+    decoding the payload or building SeqRecord objects.
+
+    Args:
+        chunks: Iterable of bytes (e.g. ``requests.Response.iter_content``).
+
+    Yields:
+        (header, sequence) tuples of bytes; the header has no leading '>' and the 
+        sequence is uppercased with line breaks removed.
+    """
+    def parse_block(block):
+        header, _, body = block.partition(b'\n')
+        return header.lstrip(b'>').rstrip(b'\r'), body.translate(UPPERCASE_TABLE, b'\r\n')
+
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        # Everything before the last record start is made of complete records
+        last = buf.rfind(b'\n>')
+        if last == -1:
+            continue
+        for block in bytes(buf[:last]).split(b'\n>'):
+            if block.strip():
+                yield parse_block(block)
+        del buf[:last + 1]
+
+    for block in bytes(buf).split(b'\n>'):
+        if block.strip():
+            yield parse_block(block)
+
+
+@njit(cache=True)
+def sample_peptides(flat, offs, valid_lut, target, min_len, max_len, seed, max_draws):
+    """
+    Draws unique random peptides from a concatenated protein buffer.
+
+    Peptides containing invalid residues are rejected via the lookup table, and 
+    duplicates are detected with a pair of polynomial hashes packed into one 
+    int64 fingerprint, so no Python strings are created inside the loop.
+
+    Args:
+        flat: uint8 array with all (uppercase) protein sequences concatenated.
+        offs: int64 array of length n_proteins + 1 with each sequence's start offset.
+        valid_lut: uint8 lookup table of 256 entries (0 = invalid residue).
+        target: The number of peptides to accept.
+        min_len: Minimum peptide length.
+        max_len: Maximum peptide length.
+        seed: Seed for the random generator.
+        max_draws: Upper bound on candidates drawn before giving up.
+
+    Returns:
+        A tuple (protein indices, starts within each protein, sizes) of the accepted peptides.
+    """
+    np.random.seed(seed)
+    n_proteins = offs.size - 1
+    idxs = np.empty(target, dtype=np.int64)
+    starts = np.empty(target, dtype=np.int64)
+    sizes = np.empty(target, dtype=np.int64)
+    seen = dict()
+    n_found = 0
+    draws = 0
+
+    while n_found < target and draws < max_draws:
+        draws += 1
+        prot = np.random.randint(0, n_proteins)
+        seq_start = offs[prot]
+        seq_len = offs[prot + 1] - seq_start
+        size = np.random.randint(min_len, min(max_len, seq_len) + 1)
+        start = np.random.randint(0, seq_len - size + 1)
+
+        valid = True
+        h1 = 0
+        h2 = 0
+        for i in range(seq_start + start, seq_start + start + size):
+            c = int(flat[i])
+            if valid_lut[c] == 0:
+                valid = False
+                break
+            h1 = (h1 * 31 + c) % 2147483647
+            h2 = (h2 * 131 + c) % 2147483629
+        if not valid:
+            continue
+
+        fingerprint = (h1 << 31) | h2
+        if fingerprint in seen:
+            continue
+        seen[fingerprint] = 1
+
+        idxs[n_found] = prot
+        starts[n_found] = start
+        sizes[n_found] = size
+        n_found += 1
+
+    return idxs[:n_found], starts[:n_found], sizes[:n_found]
+
+
 def sample_and_export_fasta(
     df: pd.DataFrame, 
     output_fasta_name: str, 
@@ -143,30 +261,28 @@ def sample_and_export_fasta(
     logger.info(f"  - Writing {len(df_sampled)} records to {output_fasta_name}...")
 
     try:
-        with open(output_fasta_name, 'w') as f:
-            for _, row in df_sampled.iterrows():
+        # Build all headers as one vectorized string operation (no per-row iteration)
+        if dataset_type == 'UNIPROT':
+            fasta_headers = ">" + df_sampled['Original_Header']
 
-                if dataset_type == 'UNIPROT':
-                    fasta_header = f">{row['Original_Header']}"
+        elif dataset_type == 'IEDB':
+            # Desired format: >infectious-34 | B13 antigen | Trypanosoma cruzi | http://www.iedb.org/epitope/34
+            epitope_ids = df_sampled['Epitope_ID']
+            fasta_headers = (
+                ">infectious-" + epitope_ids + " | "
+                + df_sampled['Protein_Name'] + " | "
+                + df_sampled['Organism'] + " | "
+                + IEDB_EPITOPE_BASE_URL + epitope_ids
+            )
 
-                elif dataset_type == 'IEDB':
-                    # Desired format: >infectious-34 | B13 antigen | Trypanosoma cruzi | http://www.iedb.org/epitope/34
-                    
-                    epitope_id_val = row['Epitope_ID']
-                    iedb_link = f"{IEDB_EPITOPE_BASE_URL}{epitope_id_val}"
-                    
-                    fasta_header = (
-                        f">infectious-{epitope_id_val} | "
-                        f"{row['Protein_Name']} | "
-                        f"{row['Organism']} | "
-                        f"{iedb_link}"
-                    )
-                    
-                else:
-                     raise ValueError(f"Unrecognized dataset type: {dataset_type}.")
+        else:
+             raise ValueError(f"Unrecognized dataset type: {dataset_type}.")
+
+        records = fasta_headers + '\n' + df_sampled['Sequence'].astype(str) + '\n'
 
-                f.write(fasta_header + '\n')
-                f.write(row['Sequence'] + '\n')
+        # One large buffered write of the whole file instead of many small ones
+        with open(output_fasta_name, 'wb', buffering=1 << 20) as f:
+            f.write(''.join(records).encode())
 
         logger.info(f"✅ FASTA file generated: {output_fasta_name} (Final size: {len(df_sampled)})")
         return True
@@ -179,6 +295,30 @@ def sample_and_export_fasta(
 # 3. USE CASE FUNCTIONS (BUSINESS LOGIC)
 # ------------------------------------------------------------------------------
 
+def read_iedb_page(text: str) -> pa.Table:
+    """
+    Parses one IEDB CSV page with every column typed as string.
+
+    Types inferred page by page can disagree (e.g. int64 vs string), which
+    pa.concat_tables cannot merge, so the schema is fixed up front.
+
+    Args:
+        text: The CSV text of a single page, header included.
+
+    Returns:
+        A pyarrow Table with one string column per CSV column.
+    """
+    # Only the header line is parsed in Python (csv handles the quoting)
+    header, _, body = text.partition("\n")
+    column_types = {name: pa.string() for name in next(csv.reader([header]))}
+    if not body.strip():
+        # Header-only page: pyarrow cannot read a CSV without data rows
+        return pa.schema(column_types.items()).empty_table()
+
+    convert_options = pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    return pacsv.read_csv(pa.py_buffer(text.encode()), convert_options=convert_options)
+
+
 def download_positive_data(output_filename: str = IEDB_CSV_FILE) -> Tuple[Optional[pd.DataFrame], int]:
     """
     Downloads IEDB B-cell epitope data using the paginated IEDB Query API, 
@@ -216,7 +356,7 @@ def download_positive_data(output_filename: str = IEDB_CSV_FILE) -> Tuple[Option
     url = IEDB_QUERY_URL
     limit = IEDB_PAGINATION_LIMIT
     offset = 0
-    all_chunks = []
+    all_tables = []
     
     # 1. Probe the API to ensure connection is valid
     try:
@@ -229,47 +369,66 @@ def download_positive_data(output_filename: str = IEDB_CSV_FILE) -> Tuple[Option
         logger.error(f"❌ IEDB API Probe failed (Connection/Auth error): {e}")
         return None, 0
     
-    # 2. Paginated Download Loop
-    batch = 1
-    while True:
+    # 2. Paginated Download Loop (pipelined: several pages are in flight while
+    #    the oldest completed one is being parsed)
+    def fetch_page(page_offset: int) -> str:
         params_list = list(IEDB_BASE_PARAMS_LIST)
-        params_list.extend([("limit", limit), ("offset", offset)])
-        
-        try:
-            logger.info(f"  - Downloading batch {batch} (Offset: {offset})...")
-            r = requests.get(url, headers=DEFAULT_REQUEST_HEADERS, params=params_list, timeout=600)
-            r.raise_for_status()
-            text = r.text.strip()
-            
-            if not text: 
-                logger.info(f"  - Batch {batch} returned empty data. Ending download.")
-                break
+        params_list.extend([("limit", limit), ("offset", page_offset)])
+        r = requests.get(url, headers=DEFAULT_REQUEST_HEADERS, params=params_list, timeout=600)
+        r.raise_for_status()
+        return r.text.strip()
+
+    batch = 1
+    inflight = deque()
+    executor = ThreadPoolExecutor(max_workers=IEDB_MAX_INFLIGHT_REQUESTS)
+    try:
+        while True:
+            # Keep the pipeline full, spacing submissions to respect the server's rate limits
+            while len(inflight) < IEDB_MAX_INFLIGHT_REQUESTS:
+                inflight.append((offset, executor.submit(fetch_page, offset)))
+                offset += limit
+                time.sleep(IEDB_SUBMIT_INTERVAL)
+
+            # Pages are consumed in offset order
+            batch_offset, future = inflight.popleft()
+
+            try:
+                logger.info(f"  - Downloading batch {batch} (Offset: {batch_offset})...")
+                text = future.result()
                 
-            df_chunk = pd.read_csv(io.StringIO(text), low_memory=False)
-            
-            if df_chunk.empty: 
-                logger.info(f"  - Batch {batch} returned empty DataFrame. Ending download.")
-                break
+                if not text: 
+                    logger.info(f"  - Batch {batch} returned empty data. Ending download.")
+                    break
+                    
+                tbl_chunk = read_iedb_page(text)
                 
-            all_chunks.append(df_chunk)
-            
-            if len(df_chunk) < limit: 
-                logger.info(f"  - Batch {batch} was partial ({len(df_chunk)} records). Download complete.")
-                break
+                if tbl_chunk.num_rows == 0: 
+                    logger.info(f"  - Batch {batch} returned empty table. Ending download.")
+                    break
+                    
+                all_tables.append(tbl_chunk)
                 
-            offset += limit
-            batch += 1
-            time.sleep(0.5)
-            
-        except Exception as e:
-            logger.error(f"❌ API Connection/Read Error in batch {batch}: {e}")
-            break
+                if tbl_chunk.num_rows < limit: 
+                    logger.info(f"  - Batch {batch} was partial ({tbl_chunk.num_rows} records). Download complete.")
+                    break
+                    
+                batch += 1
+                
+            except Exception as e:
+                logger.error(f"❌ API Connection/Read Error in batch {batch}: {e}")
+                break
+    finally:
+        # Drop the pages requested past the end of the data without waiting for
+        # the ones already running (each may take up to the request timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    if not all_chunks:
+    if not all_tables:
         logger.error("\n❌ No data downloaded from IEDB API.")
         return None, 0
 
-    df_raw = pd.concat(all_chunks, ignore_index=True)
+    # Chain the Arrow batches (no column copy) and convert to pandas only once
+    full_table = pa.concat_tables(all_tables, promote_options="permissive")
+    df_raw = full_table.to_pandas(types_mapper=pd.ArrowDtype)
     logger.info(f"  - Total raw records downloaded: {len(df_raw)}")
     
     # --- Cleaning, Standardization, and Column Mapping ---
@@ -355,56 +514,54 @@ def generate_negative_data(target_count: int, output_filename: str = UNIPROT_CSV
     logger.info(f"  - Target count for negative sequences: {target_count}")
     logger.info("  - Downloading reviewed sequences (Swiss-Prot) from UniProt...")
     
+    MIN_LEN, MAX_LEN = MIN_PEPTIDE_LENGTH, MAX_PEPTIDE_LENGTH 
+
+    # Stream and parse the FASTA as bytes, keeping only proteins long enough to yield a peptide
+    pool_headers = []
+    pool_seqs = []
+    total_proteins = 0
     try:
-        req = requests.get(UNIPROT_URL, params=UNIPROT_PARAMS, stream=True, timeout=600)
-        req.raise_for_status()
-        
-        fasta_content = req.text
-        background_seqs = list(SeqIO.parse(io.StringIO(fasta_content), "fasta"))
+        with requests.get(UNIPROT_URL, params=UNIPROT_PARAMS, stream=True, timeout=600) as req:
+            req.raise_for_status()
+
+            for header, seq in iter_fasta_records(req.iter_content(chunk_size=1 << 20)):
+                total_proteins += 1
+                if len(seq) >= MIN_LEN:
+                    pool_headers.append(header)
+                    pool_seqs.append(seq)
     except Exception as e:
         logger.error(f"❌ Error downloading UniProt data: {e}")
         return pd.DataFrame()
 
     synthetic_data = []
-    seen_peptides = set()
-    sample_pool = list(range(len(background_seqs)))
 
-    logger.info(f"  - Total proteins downloaded for sampling: {len(background_seqs)}")
+    logger.info(f"  - Total proteins downloaded for sampling: {total_proteins}")
     logger.info("  - Sampling random peptides...")
-    
-    MIN_LEN, MAX_LEN = MIN_PEPTIDE_LENGTH, MAX_PEPTIDE_LENGTH 
-    
-    while len(synthetic_data) < target_count and sample_pool:
-        if not sample_pool:
-             break 
 
-        idx_to_sample = random.choice(sample_pool)
-        prot = background_seqs[idx_to_sample]
-        s_str = str(prot.seq).upper()
-        
-        if len(s_str) < MIN_LEN:
-            sample_pool.remove(idx_to_sample)
-            continue
-        
-        size = random.randint(MIN_LEN, min(MAX_LEN, len(s_str)))
-        start = random.randint(0, len(s_str) - size)
-        pep = s_str[start : start + size]
+    if pool_seqs and target_count > 0:
+        # Flat uint8 buffer + offsets: the layout consumed by the compiled kernel
+        flat = np.frombuffer(b''.join(pool_seqs), dtype=np.uint8)
+        offs = np.zeros(len(pool_seqs) + 1, dtype=np.int64)
+        offs[1:] = np.cumsum([len(seq) for seq in pool_seqs])
+
+        idxs, starts, sizes = sample_peptides(
+            flat, offs, VALID_AA_LUT, target_count, MIN_LEN, MAX_LEN, 42, target_count * 100
+        )
+
+        # Decode back to Python strings only for the accepted peptides
+        for idx, start, size in zip(idxs.tolist(), starts.tolist(), sizes.tolist()):
+            original_header = pool_headers[idx].decode('utf-8', errors='replace').strip()
+            record_id = original_header.split(maxsplit=1)[0] if original_header else ''
+            protein_id = record_id.split('|')[1] if '|' in record_id else record_id
 
-        if pep not in seen_peptides and not set(pep).intersection(set("BJOUXZ")):
-            seen_peptides.add(pep)
-            
-            protein_id = prot.id.split('|')[1] if '|' in prot.id else prot.id
-            original_header = prot.description.strip()
-            
             synthetic_data.append({
-                'Sequence': pep, 
+                'Sequence': pool_seqs[idx][start : start + size].decode('ascii', errors='replace'), 
                 'Group': 'UNIPROT_RANDOM', 
                 'Organism': 'UniProt_Random', 
                 'Source_Protein': protein_id,
                 'Original_Header': original_header
             })
 
-
     df_synth = pd.DataFrame(synthetic_data)
 
     if len(df_synth) < target_count:
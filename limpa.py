@@ -1,46 +1,67 @@
 import os
-import gzip
-from datetime import datetime
-
-# Intervalo de tempo desejado
-start_time = datetime.strptime("07:20:00", "%H:%M:%S").time()
-end_time = datetime.strptime("08:20:00", "%H:%M:%S").time()
-
-# Caminho da pasta atual
-folder_path = os.getcwd()
-
-# Itera sobre todos os arquivos .gz na pasta
-for filename in os.listdir(folder_path):
-    if filename.endswith(".gz"):
-        gz_path = os.path.join(folder_path, filename)
-        extracted_path = os.path.join(folder_path, filename[:-3])  # remove .gz
-
-        # Descomprime o arquivo
-        try:
-            with gzip.open(gz_path, 'rt', encoding='utf-8', errors='ignore') as gz_file:
-                lines = gz_file.readlines()
-        except Exception as e:
-            print(f"Erro ao descomprimir {filename}: {e}")
-            continue
-
-        # Filtra as linhas entre 07:20 e 08:20
-        filtered_lines = []
-        for line in lines:
-            try:
-                # Espera que a linha comece com "YYYY-MM-DD HH:MM:SS.mmm"
-                timestamp_str = line.strip().split()[1]  # pega HH:MM:SS.mmm
-                log_time = datetime.strptime(timestamp_str.split('.')[0], "%H:%M:%S").time()
-                if start_time <= log_time <= end_time:
-                    filtered_lines.append(line)
-            except (IndexError, ValueError):
-                continue  # ignora linhas malformadas
-
-        # Salva o conteúdo filtrado no novo arquivo
-        with open(extracted_path, 'w', encoding='utf-8') as out_file:
-            out_file.writelines(filtered_lines)
-
-        # Remove o arquivo .gz original
-        os.remove(gz_path)
-
-print("✅ Processamento concluído. Os arquivos foram filtrados e os .gz removidos.")
+from concurrent.futures import ProcessPoolExecutor
 
+# ISA-L (isal) tem um inflate vetorizado (SIMD); usa o gzip padrão se não estiver instalado
+try:
+    from isal import igzip as gzip_mod
+except ImportError:
+    import gzip as gzip_mod
+
+# Intervalo de tempo desejado ("HH:MM:SS" em ASCII de largura fixa:
+# a comparação de bytes equivale à comparação de horários)
+START = b"07:20:00"
+END = b"08:20:00"
+
+
+def filter_gz(gz_path):
+    """
+    Descomprime um .gz mantendo só as linhas dentro do intervalo e remove o
+    original. Retorna o caminho do arquivo gerado, ou None em caso de erro.
+    """
+    filename = os.path.basename(gz_path)
+    extracted_path = gz_path[:-3]  # remove .gz
+
+    # Descomprime em streaming, gravando apenas as linhas entre 07:20 e 08:20
+    try:
+        with gzip_mod.open(gz_path, 'rb') as gz_file, open(extracted_path, 'wb') as out_file:
+            for line in gz_file:
+                try:
+                    # Espera que a linha comece com "YYYY-MM-DD HH:MM:SS.mmm"
+                    ts = line.split(None, 2)[1][:8]  # pega HH:MM:SS
+                except IndexError:
+                    continue  # ignora linhas malformadas
+                if len(ts) != 8 or ts[2:3] != b":" or ts[5:6] != b":":
+                    continue
+
+                # Logs estão em ordem cronológica: passou do fim, não há mais nada a filtrar
+                if ts > END:
+                    break
+                if START <= ts:
+                    out_file.write(line)
+    except Exception as e:
+        print(f"Erro ao descomprimir {filename}: {e}")
+        # Descarta a saída parcial e mantém o .gz original
+        if os.path.exists(extracted_path):
+            os.remove(extracted_path)
+        return None
+
+    # Remove o arquivo .gz original
+    os.remove(gz_path)
+    return extracted_path
+
+
+if __name__ == "__main__":
+    # Caminho da pasta atual
+    folder_path = os.getcwd()
+
+    # Todos os arquivos .gz na pasta
+    gz_paths = [
+        entry.path for entry in os.scandir(folder_path)
+        if entry.is_file() and entry.name.endswith(".gz")
+    ]
+
+    # Um processo por núcleo: a descompressão gzip é limitada por CPU
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(filter_gz, gz_paths))
+
+    print("✅ Processamento concluído. Os arquivos foram filtrados e os .gz removidos.")
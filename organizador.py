@@ -1,5 +1,6 @@
 import os
 import shutil
+from functools import lru_cache
 
 # Mapeamento de extensões para categorias
 CATEGORIES = {
@@ -13,65 +14,94 @@ CATEGORIES = {
 
 REST_FOLDER = "RESTO"
 
+# Índice plano extensão -> categoria, montado uma única vez na importação
+EXT_TO_CATEGORY = {ext: category for category, extensions in CATEGORIES.items() for ext in extensions}
+
+# Pastas de destino (ignoradas durante a varredura)
+TARGET_FOLDERS = set(CATEGORIES) | {REST_FOLDER}
+
 def ensure_folder(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
+@lru_cache(maxsize=256)
 def get_category(ext):
-    ext = ext.lower()
-    for category, extensions in CATEGORIES.items():
-        if ext in extensions:
-            return category
-    return REST_FOLDER
+    return EXT_TO_CATEGORY.get(ext.lower(), REST_FOLDER)
 
-def unique_name(dest_folder, filename):
+def unique_name(taken, filename):
     """
     Garante que o arquivo não sobrescreva outro já existente.
-    Se existir, adiciona números ao final.
+    Se existir, adiciona um contador ao final (nome_1.ext, nome_2.ext, ...).
+    `taken` é o conjunto de nomes já ocupados na pasta de destino e é
+    atualizado com o nome escolhido, evitando consultas ao disco.
     """
     name, ext = os.path.splitext(filename)
     candidate = filename
-    while os.path.exists(os.path.join(dest_folder, candidate)):
-        candidate = name + "1" + ext
-        name = name + "1"  # acumula os números
+    i = 1
+    while candidate in taken:
+        candidate = f"{name}_{i}{ext}"
+        i += 1
+    taken.add(candidate)
     return candidate
 
-def organize_directory(root_dir):
-    # Cria pastas principais
-    for category in CATEGORIES.keys():
-        ensure_folder(os.path.join(root_dir, category))
-    ensure_folder(os.path.join(root_dir, REST_FOLDER))
+def organize_tree(dirpath, root_dir, dest_folders, taken):
+    """
+    Percorre a árvore de baixo para cima com os.scandir, movendo os arquivos
+    para as pastas de destino. Retorna True se a pasta foi removida.
+    """
+    with os.scandir(dirpath) as it:
+        entries = list(it)
 
-    # Percorre recursivamente
-    for dirpath, dirnames, filenames in os.walk(root_dir, topdown=False):
-        # Ignora as pastas de destino
-        if os.path.basename(dirpath).upper() in list(CATEGORIES.keys()) + [REST_FOLDER]:
+    # Processa primeiro as subpastas (symlinks para pastas não são seguidos)
+    remaining = []
+    for entry in entries:
+        if entry.is_dir() and not entry.is_symlink():
+            if not organize_tree(entry.path, root_dir, dest_folders, taken):
+                remaining.append(entry)
+        elif entry.is_dir():
+            remaining.append(entry)
+
+    # Ignora as pastas de destino
+    if os.path.basename(dirpath).upper() in TARGET_FOLDERS:
+        return False
+
+    for entry in entries:
+        if entry.is_dir():
             continue
+        ext = os.path.splitext(entry.name)[1]
+        category = get_category(ext)
+        dest_folder = dest_folders[category]
 
-        for file in filenames:
-            file_path = os.path.join(dirpath, file)
-            ext = os.path.splitext(file)[1]
-            category = get_category(ext)
-            dest_folder = os.path.join(root_dir, category)
-
-            # Resolve conflitos de nome
-            new_name = unique_name(dest_folder, file)
-            dest_path = os.path.join(dest_folder, new_name)
-
-            # Move arquivo
-            shutil.move(file_path, dest_path)
-
-        # Move pastas vazias ou não categorizadas para RESTO
-        if dirpath != root_dir and not os.listdir(dirpath):
-            shutil.rmtree(dirpath, ignore_errors=True)
-        elif dirpath != root_dir:
-            # Se sobrou algo não categorizado
-            dest_folder = os.path.join(root_dir, REST_FOLDER)
-            for leftover in os.listdir(dirpath):
-                src_path = os.path.join(dirpath, leftover)
-                dest_path = os.path.join(dest_folder, unique_name(dest_folder, leftover))
-                shutil.move(src_path, dest_path)
-            shutil.rmtree(dirpath, ignore_errors=True)
+        # Resolve conflitos de nome
+        new_name = unique_name(taken[category], entry.name)
+        dest_path = os.path.join(dest_folder, new_name)
+
+        # Move arquivo
+        shutil.move(entry.path, dest_path)
+
+    if dirpath == root_dir:
+        return False
+
+    # Move o que sobrou (não categorizado) para RESTO e remove a pasta
+    if remaining:
+        dest_folder = dest_folders[REST_FOLDER]
+        for leftover in remaining:
+            dest_path = os.path.join(dest_folder, unique_name(taken[REST_FOLDER], leftover.name))
+            shutil.move(leftover.path, dest_path)
+    shutil.rmtree(dirpath, ignore_errors=True)
+    return True
+
+def organize_directory(root_dir):
+    # Cria pastas principais (caminhos calculados uma única vez)
+    dest_folders = {folder: os.path.join(root_dir, folder) for folder in TARGET_FOLDERS}
+    for dest_folder in dest_folders.values():
+        ensure_folder(dest_folder)
+
+    # Nomes já ocupados em cada destino, lidos do disco uma única vez
+    taken = {folder: set(os.listdir(path)) for folder, path in dest_folders.items()}
+
+    # Percorre recursivamente
+    organize_tree(root_dir, root_dir, dest_folders, taken)
 
 if __name__ == "__main__":
     root = os.getcwd()  # Diretório atual
@@ -5,21 +5,40 @@ TSV Query Tool - Execute SQL queries directly on TSV files
 Usage:
     python query.py <tsv_file> '<sql_query>'
 
+The first query on a TSV file caches it as Parquet next to the file
+(<tsv_file>.<mtime>.<size>.parquet); later queries read the cache instead
+of parsing the TSV again.
+
+Queries run in DuckDB's SQL dialect (not SQLite's). Notable differences:
+    - LIKE is case-sensitive; use ILIKE for case-insensitive matching
+    - '/' always does float division (7/2 = 3.5); use '//' for integer division
+
 Examples:
     python query.py output.tsv 'SELECT * FROM data LIMIT 10'
     python query.py output.tsv 'SELECT Entry, Mass FROM data WHERE Mass > 50000'
     python query.py output.tsv 'SELECT COUNT(*) FROM data'
 """
 
-import pandas as pd
-import sqlite3
+import duckdb
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import re
 import sys
 import os
-import tempfile
 from pathlib import Path
 import argparse
 
 
+# TSV parsing options shared by the loader and --info
+TSV_PARSE_OPTIONS = pacsv.ParseOptions(delimiter='\t')
+# Large blocks let pyarrow parse the file in parallel threads
+TSV_READ_OPTIONS = pacsv.ReadOptions(block_size=64 << 20)
+
+# Characters replaced by '_' in column names (single str.translate pass)
+COLUMN_NAME_TRANS = str.maketrans({c: '_' for c in ' []()-/\\.,;:'})
+UNDERSCORE_RUN_RE = re.compile(r'_+')
+
+
 class TSVQueryTool:
     def __init__(self, tsv_file, verbose=False):
         """
@@ -31,73 +50,119 @@ class TSVQueryTool:
         """
         self.tsv_file = tsv_file
         self.verbose = verbose
-        self.temp_db = None
         self.conn = None
         self.table_name = 'data'  # Default table name
 
     def sanitize_column_names(self, columns):
-        """Sanitize column names for SQLite compatibility"""
-        sanitized = {}
+        """
+        Sanitize column names for SQL compatibility
+
+        Returns one name per position; repeated names get a _1, _2, ... suffix
+        """
+        sanitized = []
+        taken = set()
         for col in columns:
-            # Replace problematic characters
-            new_col = col.replace(' ', '_')
-            new_col = new_col.replace('[', '_')
-            new_col = new_col.replace(']', '_')
-            new_col = new_col.replace('(', '_')
-            new_col = new_col.replace(')', '_')
-            new_col = new_col.replace('-', '_')
-            new_col = new_col.replace('/', '_')
-            new_col = new_col.replace('\\', '_')
-            new_col = new_col.replace('.', '_')
-            new_col = new_col.replace(',', '_')
-            new_col = new_col.replace(';', '_')
-            new_col = new_col.replace(':', '_')
-            # Remove consecutive underscores
-            while '__' in new_col:
-                new_col = new_col.replace('__', '_')
-            new_col = new_col.strip('_')
+            # Replace problematic characters and remove consecutive underscores
+            new_col = UNDERSCORE_RUN_RE.sub('_', col.translate(COLUMN_NAME_TRANS)).strip('_')
 
             # Ensure it doesn't start with a number
             if new_col and new_col[0].isdigit():
                 new_col = 'col_' + new_col
 
-            sanitized[col] = new_col
+            # De-duplicate (SQL column names are case-insensitive)
+            base, n = new_col, 0
+            while new_col.lower() in taken:
+                n += 1
+                new_col = f"{base}_{n}"
+            taken.add(new_col.lower())
+
+            sanitized.append(new_col)
 
         return sanitized
 
-    def load_tsv_to_db(self):
-        """Load TSV file into a temporary SQLite database"""
+    def cache_path(self):
+        """Parquet cache path for the current version of the TSV file (keyed on mtime and size)"""
+        stat = os.stat(self.tsv_file)
+        return f"{self.tsv_file}.{stat.st_mtime_ns}.{stat.st_size}.parquet"
+
+    def remove_stale_caches(self, current_cache):
+        """Delete Parquet caches left by older versions of the TSV file"""
+        directory = os.path.dirname(os.path.abspath(self.tsv_file))
+        stale_re = re.compile(re.escape(os.path.basename(self.tsv_file)) + r'\.\d+\.\d+\.parquet')
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if stale_re.fullmatch(name) and path != os.path.abspath(current_cache):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def read_tsv_table(self):
+        """Parse the TSV file into a pyarrow Table with sanitized column names"""
+        # Load TSV (multithreaded columnar parse)
+        table = pacsv.read_csv(self.tsv_file, read_options=TSV_READ_OPTIONS,
+                               parse_options=TSV_PARSE_OPTIONS)
+
         if self.verbose:
-            print(f"Loading TSV file: {self.tsv_file}", file=sys.stderr)
+            print(f"Loaded {table.num_rows} rows and {table.num_columns} columns", file=sys.stderr)
 
-        try:
-            # Load TSV
-            df = pd.read_csv(self.tsv_file, sep='\t', low_memory=False)
+        # Sanitize column names
+        column_mapping = list(zip(table.column_names, self.sanitize_column_names(table.column_names)))
+        table = table.rename_columns([new for _, new in column_mapping])
 
-            if self.verbose:
-                print(f"Loaded {len(df)} rows and {len(df.columns)} columns", file=sys.stderr)
+        if self.verbose and any(orig != new for orig, new in column_mapping):
+            print("Column names sanitized:", file=sys.stderr)
+            for orig, new in column_mapping:
+                if orig != new:
+                    print(f"  '{orig}' -> '{new}'", file=sys.stderr)
 
-            # Sanitize column names
-            column_mapping = self.sanitize_column_names(df.columns)
-            df_renamed = df.rename(columns=column_mapping)
+        return table
 
-            if self.verbose and any(orig != new for orig, new in column_mapping.items()):
-                print("Column names sanitized:", file=sys.stderr)
-                for orig, new in column_mapping.items():
-                    if orig != new:
-                        print(f"  '{orig}' -> '{new}'", file=sys.stderr)
+    def write_cache(self, table, cache):
+        """
+        Write the parsed table as the Parquet cache of the TSV file
 
-            # Create temporary database
-            self.temp_db = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
-            if self.verbose:
-                print(f"Creating temporary database: {self.temp_db.name}", file=sys.stderr)
+        Args:
+            table: pyarrow Table returned by read_tsv_table()
+            cache: Path of the Parquet file to write
+        """
+        # Write to a temporary name first so an interrupted run never leaves a partial cache
+        tmp_cache = cache + '.tmp'
+        pq.write_table(table, tmp_cache, compression='zstd', row_group_size=65536)
+        os.replace(tmp_cache, cache)
+        self.remove_stale_caches(cache)
+
+        if self.verbose:
+            print(f"Parquet cache written: {cache}", file=sys.stderr)
+
+    def load_tsv_to_db(self):
+        """Expose the TSV file (through its Parquet cache) as a table in an in-memory DuckDB database"""
+        if self.verbose:
+            print(f"Loading TSV file: {self.tsv_file}", file=sys.stderr)
 
-            # Connect and load data
-            self.conn = sqlite3.connect(self.temp_db.name)
-            df_renamed.to_sql(self.table_name, self.conn, if_exists='replace', index=False)
+        try:
+            self.conn = duckdb.connect()
+            cache = self.cache_path()
+
+            if not os.path.exists(cache):
+                table = self.read_tsv_table()
+                try:
+                    self.write_cache(table, cache)
+                except OSError as e:
+                    # Cache not writable (e.g. read-only folder): the Arrow table is registered without copying
+                    if self.verbose:
+                        print(f"Could not write Parquet cache ({e}); querying in memory", file=sys.stderr)
+                    self.conn.register(self.table_name, table)
+                    return True
+            elif self.verbose:
+                print(f"Using Parquet cache: {cache}", file=sys.stderr)
+
+            # DuckDB reads only the columns and row groups a query needs
+            cache_sql = cache.replace("'", "''")
+            self.conn.execute(f"CREATE VIEW {self.table_name} AS SELECT * FROM read_parquet('{cache_sql}')")
 
             if self.verbose:
-                print(f"Data loaded into table '{self.table_name}'", file=sys.stderr)
+                print(f"Data available as table '{self.table_name}'", file=sys.stderr)
 
             return True
 
@@ -113,7 +178,7 @@ class TSVQueryTool:
             query: SQL query string
 
         Returns:
-            pandas DataFrame with results
+            pyarrow Table with results
         """
         if self.conn is None:
             raise RuntimeError("Database not loaded. Call load_tsv_to_db() first.")
@@ -122,8 +187,8 @@ class TSVQueryTool:
             if self.verbose:
                 print(f"Executing query: {query}", file=sys.stderr)
 
-            # Execute query
-            result = pd.read_sql_query(query, self.conn)
+            # Execute query; results stay columnar (no pandas/per-row objects)
+            result = self.conn.execute(query).to_arrow_table()
 
             if self.verbose:
                 print(f"Query returned {len(result)} rows", file=sys.stderr)
@@ -139,7 +204,7 @@ class TSVQueryTool:
         Print query results in a formatted table with borders
 
         Args:
-            df: pandas DataFrame with results
+            df: pyarrow Table with results
             max_rows: Maximum number of rows to display
             max_width: Maximum width for output
         """
@@ -148,44 +213,46 @@ class TSVQueryTool:
             return
 
         # Limit rows if specified
-        display_df = df.head(max_rows) if max_rows else df
+        display_df = df.slice(0, max_rows) if max_rows else df
+
+        # Convert each column to Python strings once; reused for widths and rendering
+        # (not a numpy unicode array: that pads every cell to the column's longest value)
+        str_cols = [list(map(str, column.to_numpy(zero_copy_only=False))) for column in display_df.columns]
 
         # Calculate column widths
-        col_widths = {}
-        for col in display_df.columns:
+        widths = []
+        for col, values in zip(display_df.column_names, str_cols):
             # Get max width between column name and values
-            max_val_width = display_df[col].astype(str).str.len().max()
-            col_widths[col] = max(len(str(col)), max_val_width, 3)  # minimum 3 chars
+            width = max(len(str(col)), max(map(len, values), default=0), 3)  # minimum 3 chars
 
             # Limit width if max_width is specified
             if max_width:
-                col_widths[col] = min(col_widths[col], max_width)
+                width = min(width, max_width)
+            widths.append(width)
 
         # Build separator line
-        separator = '+' + '+'.join(['-' * (w + 2) for w in col_widths.values()]) + '+'
+        separator = '+' + '+'.join(['-' * (w + 2) for w in widths]) + '+'
 
         # Print top border
         print(separator)
 
         # Print header
         header_parts = []
-        for col in display_df.columns:
-            header_parts.append(f" {str(col):<{col_widths[col]}} ")
+        for col, width in zip(display_df.column_names, widths):
+            header_parts.append(f" {str(col):<{width}} ")
         print('|' + '|'.join(header_parts) + '|')
 
         # Print header separator
         print(separator)
 
-        # Print rows
-        for _, row in display_df.iterrows():
-            row_parts = []
-            for col in display_df.columns:
-                value = str(row[col])
-                # Truncate if too long
-                if len(value) > col_widths[col]:
-                    value = value[:col_widths[col] - 3] + '...'
-                row_parts.append(f" {value:<{col_widths[col]}} ")
-            print('|' + '|'.join(row_parts) + '|')
+        # Print rows with a precomputed template (no per-row Series allocation)
+        row_format = '|' + '|'.join(f' {{:<{w}}} ' for w in widths) + '|'
+        for row in zip(*str_cols):
+            # Truncate if too long
+            print(row_format.format(*[
+                value[:w - 3] + '...' if len(value) > w else value
+                for value, w in zip(row, widths)
+            ]))
 
         # Print bottom border
         print(separator)
@@ -197,20 +264,13 @@ class TSVQueryTool:
             print(f"\n{len(df)} row(s) returned")
 
         if self.verbose:
-            print(f"Columns: {len(df.columns)}", file=sys.stderr)
+            print(f"Columns: {df.num_columns}", file=sys.stderr)
 
     def cleanup(self):
-        """Close connection and delete temporary database"""
+        """Close the database connection"""
         if self.conn:
             self.conn.close()
-
-        if self.temp_db:
-            try:
-                os.unlink(self.temp_db.name)
-                if self.verbose:
-                    print(f"Temporary database deleted: {self.temp_db.name}", file=sys.stderr)
-            except:
-                pass
+            self.conn = None
 
     def query(self, sql_query, max_rows=None, max_width=None):
         """
@@ -222,7 +282,7 @@ class TSVQueryTool:
             max_width: Maximum width for output
         """
         try:
-            # Load TSV into temporary database
+            # Expose TSV as a view in the in-memory database
             if not self.load_tsv_to_db():
                 return False
 
@@ -244,25 +304,28 @@ class TSVQueryTool:
 def print_table_info(tsv_file):
     """Print information about the TSV file structure"""
     try:
-        df = pd.read_csv(tsv_file, sep='\t', nrows=0, low_memory=False)
+        # Only the schema is needed: open a streaming reader instead of parsing all rows
+        reader = pacsv.open_csv(tsv_file, read_options=TSV_READ_OPTIONS,
+                                parse_options=TSV_PARSE_OPTIONS)
+        columns = reader.schema.names
 
         tool = TSVQueryTool(tsv_file)
-        column_mapping = tool.sanitize_column_names(df.columns)
+        column_mapping = list(zip(columns, tool.sanitize_column_names(columns)))
 
         print("Table: data")
         print("\nColumns:")
-        for i, (orig, new) in enumerate(column_mapping.items(), 1):
+        for i, (orig, new) in enumerate(column_mapping, 1):
             if orig != new:
                 print(f"  {i}. {new} (originally: {orig})")
             else:
                 print(f"  {i}. {new}")
 
-        print(f"\nTotal columns: {len(df.columns)}")
+        print(f"\nTotal columns: {len(columns)}")
         print("\nExample queries:")
         print(f"  SELECT * FROM data LIMIT 10")
         print(f"  SELECT COUNT(*) FROM data")
-        if len(df.columns) > 0:
-            first_col = list(column_mapping.values())[0]
+        if len(columns) > 0:
+            first_col = column_mapping[0][1]
             print(f"  SELECT {first_col} FROM data")
 
     except Exception as e:
@@ -280,6 +343,9 @@ Examples:
   %(prog)s output.tsv 'SELECT Entry, Mass FROM data WHERE Mass > 50000'
   %(prog)s output.tsv 'SELECT COUNT(*) FROM data'
   %(prog)s output.tsv --info  # Show table structure
+
+Queries use DuckDB SQL (not SQLite): LIKE is case-sensitive (use ILIKE),
+and '/' is float division (use '//' for integer division).
         '''
     )
 
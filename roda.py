@@ -1,11 +1,38 @@
+import subprocess
 import ffmpeg
 
+# Encoders H.264 por hardware, em ordem de preferência (NVIDIA, Intel, Apple)
+HW_H264_ENCODERS = ['h264_nvenc', 'h264_qsv', 'h264_videotoolbox']
+
+def available_h264_encoders():
+    """
+    Lista os encoders H.264 por hardware compilados no ffmpeg, seguidos de
+    libx264 (software) como última opção.
+    """
+    try:
+        encoders = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                  capture_output=True, text=True).stdout
+    except OSError:
+        encoders = ''
+    return [encoder for encoder in HW_H264_ENCODERS if encoder in encoders] + ['libx264']
+
 def convert_webm_to_mp4(input_file, output_file):
     try:
-        ffmpeg.input(input_file).output(output_file).run()
+        # Troca só o contêiner (remux), sem recodificar: limitado apenas por I/O
+        ffmpeg.input(input_file).output(output_file, vcodec='copy', acodec='copy').run(overwrite_output=True)
         print(f'Arquivo convertido com sucesso: {output_file}')
+        return
     except ffmpeg.Error as e:
-        print(f'Erro ao converter o arquivo: {e}')
+        print(f'Remux direto não suportado, recodificando: {e}')
+
+    # Encoder compilado não garante o dispositivo presente: tenta em ordem
+    for encoder in available_h264_encoders():
+        try:
+            ffmpeg.input(input_file).output(output_file, vcodec=encoder, acodec='aac').run(overwrite_output=True)
+            print(f'Arquivo convertido com sucesso ({encoder}): {output_file}')
+            return
+        except ffmpeg.Error as e:
+            print(f'Erro ao converter o arquivo com {encoder}: {e}')
 
 # Exemplo de uso
 input_file = 'roda.webm'  # Caminho do arquivo de entrada
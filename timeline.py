@@ -1,5 +1,32 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+def process_timeline(base_dir, folder, destination):
+    folder_path = os.path.join(base_dir, folder)
+    timeline_file = os.path.join(folder_path, "timeline.html")
+
+    if os.path.exists(timeline_file):
+        # Novo nome do arquivo
+        new_name = f"timeline_{folder}.html"
+        new_path = os.path.join(folder_path, new_name)
+
+        # Renomear
+        os.rename(timeline_file, new_path)
+
+        # Copiar para pasta destino: hardlink (nenhum byte copiado) quando
+        # estiver no mesmo sistema de arquivos, cópia comum caso contrário
+        dest_path = os.path.join(destination, new_name)
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+        try:
+            os.link(new_path, dest_path)
+        except OSError:
+            shutil.copyfile(new_path, dest_path)
+        print(f"✅ Arquivo {new_name} copiado para {destination}")
+    else:
+        print(f"⚠️ Arquivo timeline.html não encontrado em {folder}")
 
 def process_timelines(base_dir):
     # Pastas principais
@@ -9,23 +36,9 @@ def process_timelines(base_dir):
     destination = os.path.join(base_dir, "timelines_coletados")
     os.makedirs(destination, exist_ok=True)
 
-    for folder in folders:
-        folder_path = os.path.join(base_dir, folder)
-        timeline_file = os.path.join(folder_path, "timeline.html")
-
-        if os.path.exists(timeline_file):
-            # Novo nome do arquivo
-            new_name = f"timeline_{folder}.html"
-            new_path = os.path.join(folder_path, new_name)
-
-            # Renomear
-            os.rename(timeline_file, new_path)
-
-            # Copiar para pasta destino
-            shutil.copy(new_path, destination)
-            print(f"✅ Arquivo {new_name} copiado para {destination}")
-        else:
-            print(f"⚠️ Arquivo timeline.html não encontrado em {folder}")
+    # Cada pasta é independente: processa em paralelo
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(partial(process_timeline, base_dir, destination=destination), folders))
 
 if __name__ == "__main__":
     # Diretório onde está o script (cpu ou gpu)
@@ -1,36 +1,111 @@
 import os
+import contextlib
 import zipfile
-import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 # Regex robusta para formatos comuns do WhatsApp:
 # Ex.: "26/11/2025, 21:09 - Nome: mensagem" ou "26/11/25 21:09 - Nome: mensagem"
-DATE_TIME_RE = re.compile(r"^(\d{2}/\d{2}/\d{2,4}),?\s+\d{2}:\d{2}\s+-")
+# Avaliada pelo pyarrow.compute (motor RE2) sobre todas as linhas de uma vez;
+# o grupo "day" é "DD/MM/YY(YY)".
+# O \s do RE2 é só ASCII; WHITESPACE reproduz o \s do re padrão, que também
+# aceita os espaços especiais (U+00A0, U+202F) usados nas exportações
+WHITESPACE = r"[\s\x{0B}\x{1C}-\x{1F}\x{85}\p{Z}]"
+DATE_TIME_PATTERN = rf"^(?P<day>\d{{2}}/\d{{2}}/\d{{2,4}}),?{WHITESPACE}+\d{{2}}:\d{{2}}{WHITESPACE}+-"
 
+@lru_cache(maxsize=4096)
 def normalize_date(date_str):
     """
     Converte 'DD/MM/YYYY' ou 'DD/MM/YY' para 'YYYY-MM-DD'.
     Se for ano com 2 dígitos, assume 20YY.
     """
-    dd, mm, yy = date_str.split('/')
-    if len(yy) == 2:
-        yy = f"20{yy}"
-    return f"{yy}-{mm}-{dd}"
+    # Formato fixo garantido pela DATE_TIME_PATTERN: dia e mês têm 2 dígitos
+    yy = "20" + date_str[6:8] if len(date_str) == 8 else date_str[6:]
+    return yy + "-" + date_str[3:5] + "-" + date_str[0:2]
+
+def extract_zip(job):
+    """
+    Extrai um .zip na pasta indicada. `job` é a tupla (zip_path, out_dir).
+    """
+    zip_path, out_dir = job
+    os.makedirs(out_dir, exist_ok=True)
+    with zipfile.ZipFile(zip_path, 'r') as z:
+        z.extractall(out_dir)
 
 def unzip_all_to_separate_folders(root_folder):
     """
     Encontra todos os .zip recursivamente e extrai cada um
     em uma pasta com o mesmo nome do arquivo (sem extensão),
-    na mesma localização do .zip.
+    na mesma localização do .zip. As extrações rodam em paralelo.
     """
+    jobs = []
     for dirpath, _, filenames in os.walk(root_folder):
         for name in filenames:
             if name.lower().endswith(".zip"):
                 zip_path = os.path.join(dirpath, name)
                 out_dir = os.path.join(dirpath, os.path.splitext(name)[0])
-                os.makedirs(out_dir, exist_ok=True)
-                with zipfile.ZipFile(zip_path, 'r') as z:
-                    z.extractall(out_dir)
+                jobs.append((zip_path, out_dir))
+
+    # Extração é limitada por I/O: threads liberam o GIL durante leitura/escrita
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(extract_zip, jobs))
+
+def forward_fill_codes(codes):
+    """
+    Propaga o último código válido (>= 0) sobre as posições com -1.
+    Posições anteriores ao primeiro código válido continuam -1.
+    """
+    # Índice da última posição válida até cada linha (acumulado em C pelo numpy)
+    last = np.maximum.accumulate(np.where(codes >= 0, np.arange(codes.size), -1))
+    return np.where(last >= 0, codes[last], -1)
+
+def read_chat_lines(txt_path):
+    """
+    Lê uma conversa uma única vez, em bytes, e devolve suas linhas como um
+    array Arrow de strings. A validação UTF-8 é feita pelo Arrow (em C);
+    se falhar, as linhas são decodificadas como latin-1.
+    """
+    with open(txt_path, "rb") as f:
+        # splitlines em bytes reconhece \n, \r\n e \r, como o modo texto
+        lines = f.read().splitlines()
+    try:
+        return pa.array(lines, type=pa.binary()).cast(pa.string())
+    except pa.ArrowInvalid:
+        # Tenta latin-1 caso utf-8 falhe
+        return pa.array([line.decode("latin-1") for line in lines], type=pa.string())
+
+def split_lines_by_day(arr):
+    """
+    Agrupa as linhas de uma conversa (array Arrow de strings) por dia
+    ('YYYY-MM-DD') de forma vetorizada. Linhas de continuação herdam o
+    último dia conhecido; linhas em branco e linhas anteriores à primeira
+    data são descartadas.
+    """
+
+    # Extrai a data de todas as linhas de uma vez (null nas linhas de continuação)
+    dates = pc.struct_field(pc.extract_regex(arr, pattern=DATE_TIME_PATTERN), [0])
+    codes, uniques = pd.factorize(dates.to_pandas())
+
+    # Datas diferentes no texto podem ser o mesmo dia (DD/MM/YY e DD/MM/YYYY)
+    day_codes, days = pd.factorize(pd.Index([normalize_date(d) for d in uniques]))
+
+    # Propaga o último dia conhecido para as linhas de continuação
+    filled = forward_fill_codes(codes)
+
+    # Mantém linhas com dia conhecido e não vazias
+    non_blank = pc.greater(pc.utf8_length(pc.utf8_trim_whitespace(arr)), 0).to_numpy(zero_copy_only=False)
+    keep = (filled >= 0) & non_blank
+
+    kept = pd.Series(arr.filter(pa.array(keep)).to_pylist(), dtype=object)
+    groups = kept.groupby(day_codes[filled[keep]], sort=False)
+    return {days[code]: group.tolist() for code, group in groups}
 
 def split_conversations_per_folder_by_day(root_folder):
     """
@@ -38,114 +113,98 @@ def split_conversations_per_folder_by_day(root_folder):
     em cada pasta onde os .txt estão. Evita reprocessar arquivos gerados.
     """
     for dirpath, _, filenames in os.walk(root_folder):
-        # Map dia -> linhas dentro desta pasta específica
-        day_lines = defaultdict(list)
+        # Arquivos temporários por dia nesta pasta: as linhas são gravadas
+        # à medida que cada conversa é classificada, sem acumular a pasta toda.
+        # Cada escrita abre e fecha o arquivo, para não esgotar o limite de
+        # arquivos abertos em conversas com milhares de dias
+        tmp_paths = {}
 
-        # Ler todos os .txt de conversa
-        for name in filenames:
-            if not name.lower().endswith(".txt"):
-                continue
-            if name.startswith("day-") or name.startswith("conversa_"):
-                # Ignora arquivos gerados pelo script
-                continue
-
-            txt_path = os.path.join(dirpath, name)
-            try:
-                with open(txt_path, "r", encoding="utf-8") as f:
-                    current_day = None
-                    for raw_line in f:
-                        line = raw_line.rstrip("\n")
-                        m = DATE_TIME_RE.match(line)
-                        if m:
-                            # Captura a parte de data (até o primeiro espaço/virgula antes da hora)
-                            # O grupo 1 é "DD/MM/YY(YY)"
-                            date_part = m.group(1)
-                            iso_day = normalize_date(date_part)
-                            current_day = iso_day
-                            day_lines[current_day].append(line)
-                        else:
-                            # Linhas de continuação pertencem ao último dia conhecido
-                            if current_day is not None and line.strip():
-                                day_lines[current_day].append(line)
-            except UnicodeDecodeError:
-                # Tenta latin-1 caso utf-8 falhe
-                with open(txt_path, "r", encoding="latin-1") as f:
-                    current_day = None
-                    for raw_line in f:
-                        line = raw_line.rstrip("\n")
-                        m = DATE_TIME_RE.match(line)
-                        if m:
-                            date_part = m.group(1)
-                            iso_day = normalize_date(date_part)
-                            current_day = iso_day
-                            day_lines[current_day].append(line)
-                        else:
-                            if current_day is not None and line.strip():
-                                day_lines[current_day].append(line)
-
-        # Escreve arquivos por dia nesta pasta (day-YYYY-MM-DD.txt)
-        for iso_day, lines in day_lines.items():
+        try:
+            # Ler todos os .txt de conversa
+            for name in filenames:
+                if not name.lower().endswith(".txt"):
+                    continue
+                if name.startswith("day-") or name.startswith("conversa_"):
+                    # Ignora arquivos gerados pelo script
+                    continue
+
+                txt_path = os.path.join(dirpath, name)
+                for iso_day, lines in split_lines_by_day(read_chat_lines(txt_path)).items():
+                    # "w" na primeira vez descarta sobras de uma execução interrompida
+                    mode = "a" if iso_day in tmp_paths else "w"
+                    tmp_path = tmp_paths.setdefault(iso_day, os.path.join(dirpath, f"day-{iso_day}.tmp"))
+                    with open(tmp_path, mode, encoding="utf-8") as fh:
+                        fh.write("\n".join(lines) + "\n")
+        except BaseException:
+            # Não deixa arquivos .tmp órfãos para trás
+            for tmp_path in tmp_paths.values():
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+            raise
+
+        # Gera os arquivos por dia nesta pasta (day-YYYY-MM-DD.txt)
+        for iso_day, tmp_path in tmp_paths.items():
             out_path = os.path.join(dirpath, f"day-{iso_day}.txt")
+            lines = []
             # Mescla se já existir (evita perda de informação)
-            existing = set()
             if os.path.exists(out_path):
-                with open(out_path, "r", encoding="utf-8") as f:
-                    for l in f:
-                        existing.add(l.rstrip("\n"))
-            # Adiciona novos sem duplicar
-            with open(out_path, "w", encoding="utf-8") as f:
-                seen = set(existing)
-                for l in existing:
-                    f.write(l + "\n")
-                for l in lines:
-                    if l not in seen:
-                        seen.add(l)
-                        f.write(l + "\n")
+                with open(out_path, "rb") as f:
+                    lines.extend(f.read().splitlines())
+            with open(tmp_path, "rb") as f:
+                lines.extend(f.read().splitlines())
+
+            # Adiciona novos sem duplicar (dict mantém a ordem de inserção)
+            deduped = dict.fromkeys(lines)
+            deduped.pop(b"", None)
+            with open(out_path, "wb") as f:
+                f.write(b"\n".join(deduped) + b"\n")
+            os.remove(tmp_path)
+
+def _merge_day(job):
+    """
+    Lê e deduplica os arquivos de um mesmo dia (executado em um processo
+    separado). Se 'conversa_YYYY-MM-DD.txt' já existir, suas linhas entram
+    depois das novas. Devolve o conteúdo final em bytes.
+    """
+    out_path, day_paths = job
+    lines = []
+    for day_path in day_paths:
+        with open(day_path, "rb") as f:
+            lines.extend(f.read().splitlines())
+
+    # Se já existir, mescla sem duplicar (linhas antigas entram depois das novas)
+    if os.path.exists(out_path):
+        with open(out_path, "rb") as f:
+            lines.extend(f.read().splitlines())
+
+    # Dedup global preservando ordem (dict mantém a ordem de inserção)
+    deduped = dict.fromkeys(lines)
+    deduped.pop(b"", None)
+    return out_path, b"\n".join(deduped) + b"\n" if deduped else b""
 
 def consolidate_all_days_to_root(root_folder):
     """
     Procura todos os arquivos 'day-YYYY-MM-DD.txt' nas subpastas
     e consolida por dia na pasta raiz como 'conversa_YYYY-MM-DD.txt',
-    removendo duplicidades.
+    removendo duplicidades. As linhas são tratadas como bytes, sem decodificar.
+    A leitura e a deduplicação de cada dia rodam em paralelo; a escrita é serial.
     """
     global_day_map = defaultdict(list)
+    for day_path in Path(root_folder).rglob("day-*.txt"):
+        global_day_map[day_path.name[4:-4]].append(day_path)  # remove 'day-' e '.txt'
 
-    for dirpath, _, filenames in os.walk(root_folder):
-        for name in filenames:
-            if name.startswith("day-") and name.endswith(".txt"):
-                iso_day = name[4:-4]  # remove 'day-' e '.txt'
-                day_path = os.path.join(dirpath, name)
-
-                # Usa set para deduplicar dentro do arquivo
-                with open(day_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.rstrip("\n")
-                        if line:
-                            global_day_map[iso_day].append(line)
+    jobs = [
+        (os.path.join(root_folder, f"conversa_{iso_day}.txt"), day_paths)
+        for iso_day, day_paths in global_day_map.items()
+    ]
+    if not jobs:
+        return
 
     # Consolida na raiz
-    for iso_day, lines in global_day_map.items():
-        out_path = os.path.join(root_folder, f"conversa_{iso_day}.txt")
-        # Dedup global preservando ordem
-        seen = set()
-        deduped = []
-        for l in lines:
-            if l not in seen:
-                seen.add(l)
-                deduped.append(l)
-
-        # Se já existir, mescla sem duplicar
-        if os.path.exists(out_path):
-            with open(out_path, "r", encoding="utf-8") as f:
-                for l in f:
-                    l = l.rstrip("\n")
-                    if l and l not in seen:
-                        seen.add(l)
-                        deduped.append(l)
-
-        with open(out_path, "w", encoding="utf-8") as f:
-            for l in deduped:
-                f.write(l + "\n")
+    with ProcessPoolExecutor() as executor:
+        for out_path, payload in executor.map(_merge_day, jobs, chunksize=4):
+            with open(out_path, "wb") as f:
+                f.write(payload)
 
 def main():
     root = os.path.dirname(os.path.abspath(__file__))